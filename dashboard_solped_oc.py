@@ -12,8 +12,8 @@ Instrucciones de uso
 --------------------
 
 1. Ejecute el script con `streamlit run dashboard_solped_oc.py` en su
-   terminal. Asegúrese de tener instaladas las dependencias `streamlit` y
-   `pandas`.
+   terminal. Asegúrese de tener instaladas las dependencias `streamlit`,
+   `pandas` (2.2 o superior), `pyarrow` y `python-calamine`.
 2. Desde la barra lateral de la aplicación, cargue su archivo Excel que
    contenga las columnas "Fecha Sol.", "SOLPED", "Descripción del
    Material", "Doc.Compra", "Proveedor", "Solicitante", "Fecha Mod.",
@@ -38,12 +38,25 @@ Autor: Asistente ChatGPT
 Fecha: 20 de febrero de 2026
 """
 
+import functools
+import hashlib
 import io
-from typing import Tuple, Optional
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import requests
 import streamlit as st
 
+logger = logging.getLogger(__name__)
+
 # Identificadores por defecto para la hoja de cálculo de Google. Al definir
 # estos valores, la aplicación puede obtener los datos automáticamente sin
 # necesidad de que el usuario ingrese manualmente el ID y el GID de la pestaña.
@@ -51,38 +64,314 @@ import streamlit as st
 DEFAULT_SHEET_ID = "1MT28ElFN2_nEPBc8sgKfqe7toWoht2ng"
 DEFAULT_GID = "220782066"
 
+# Tiempo (en segundos) durante el cual Streamlit conserva en caché los datos
+# ya procesados. Evita volver a leer el Excel o descargar la hoja de Google en
+# cada interacción con los filtros.
+CACHE_TTL_SECONDS = 600
+
+# Tiempo máximo (en segundos) de espera para la descarga desde Google Sheets.
+HTTP_TIMEOUT_SECONDS = 30
+
+# Número máximo de hojas de Google cuyos validadores HTTP (ETag /
+# Last-Modified) y última descarga se conservan para consultas condicionales.
+HTTP_VALIDATORS_MAX_URLS = 4
+
+# Número máximo de tablas de PyArrow (una por conjunto de datos cargado) que
+# se conservan en memoria.
+ARROW_TABLE_MAX_ENTRIES = 4
+
+# Opciones de filas por página para la tabla de detalle. Sólo se envía al
+# navegador la página visible; la descarga en CSV incluye todas las filas.
+PAGE_SIZE_OPTIONS = [100, 500, 2000]
+
+# Directorio donde se guarda en formato Parquet cada Excel ya procesado, con
+# el hash de su contenido como nombre. Así un reinicio de la aplicación no
+# vuelve a analizar un archivo conocido. Incrementar PARQUET_CACHE_VERSION
+# cuando cambie el procesamiento para invalidar los archivos anteriores.
+# Sólo se conservan los PARQUET_CACHE_MAX_FILES archivos usados más
+# recientemente.
+PARQUET_CACHE_DIR = Path.home() / '.cache' / 'solped'
+PARQUET_CACHE_VERSION = 2
+PARQUET_CACHE_MAX_FILES = 20
+
+# Columnas del reporte de SAP que utiliza el panel. Las demás columnas del
+# archivo Excel no se leen.
+NEEDED_COLS = [
+    'Fecha Sol.', 'SOLPED', 'Descripción del Material', 'Doc.Compra',
+    'Proveedor', 'Solicitante', 'Fecha Mod.', 'Cantidad', 'Centro', 'Almacén',
+]
+
+# Columnas de texto con pocos valores distintos; se almacenan como categorías
+# (códigos enteros de uno o dos bytes) en lugar de cadenas de Python.
+# Solicitante y Centro además se usan como filtros del panel.
+CATEGORY_COLS = ('Solicitante', 'Centro', 'Proveedor', 'Almacén')
+
+# Tipos asignados al leer el Excel. ``Doc.Compra`` mezcla números de OC con
+# textos como ``(en blanco)``, por lo que se lee siempre como cadena. Las
+# columnas de ``CATEGORY_COLS`` se convierten después de leer, igual que en
+# los demás orígenes: el lector de Excel intenta ordenar las categorías y
+# falla si una columna mezcla números y textos.
+EXCEL_DTYPES = {'Doc.Compra': 'string'}
+
+# Columnas de fecha; se convierten a datetime una única vez al cargar los datos.
+DATE_COLS = ('Fecha Sol.', 'Fecha Mod.')
+
+# Fecha máxima considerada en los gráficos mensuales. SAP usa fechas como
+# 31.12.9999 para indicar una fecha abierta; incluirlas extendería el eje por
+# miles de años. Se toma el límite de pandas en nanosegundos (año 2262).
+CHART_MAX_DATE = pd.Timestamp.max
+
+# Columnas utilizadas en el análisis de SOLPED sin OC.
+SIN_OC_ANALYSIS_COLS = ['Solicitante', 'Fecha Mod.', 'Fecha Sol.', 'Cantidad']
+
+# Textos de ``Doc.Compra`` que indican que la solicitud no tiene OC.
+SIN_OC_VALUES = ['(en blanco)', 'nan', '', 'None']
+
+# Categorías de la columna ``Tiene OC``; el código 0 es ``Con OC`` y el 1 es
+# ``Sin OC``.
+TIENE_OC_CATEGORIES = ['Con OC', 'Sin OC']
+
+
+def add_tiene_oc_column(data: pd.DataFrame) -> pd.DataFrame:
+    """Agrega la columna ``Tiene OC`` a partir de ``Doc.Compra``.
+
+    Una solicitud se considera sin OC cuando ``Doc.Compra`` está vacío o
+    contiene alguno de los textos de ``SIN_OC_VALUES``. La columna resultante
+    es categórica (códigos de un byte) en lugar de cadenas de Python.
+
+    Args:
+        data: DataFrame con la columna ``Doc.Compra``. Se modifica en sitio.
+
+    Returns:
+        El mismo DataFrame con la columna ``Tiene OC``.
+    """
+    # Muchas filas comparten el mismo Doc.Compra (la misma OC o el texto
+    # "(en blanco)"), así que sólo se limpian y clasifican los valores
+    # distintos y el resultado se propaga a cada fila mediante sus códigos
+    value_codes, uniques = pd.factorize(data['Doc.Compra'])
+    # Limpieza y comparación con los kernels de cadenas de PyArrow
+    unique_values = pa.array(pd.Series(uniques).astype('string'), type=pa.string(), from_pandas=True)
+    unique_sin_oc = pc.is_in(pc.utf8_trim_whitespace(unique_values), value_set=pa.array(SIN_OC_VALUES))
+    # factorize asigna -1 a los nulos; el último elemento de la tabla de
+    # búsqueda los clasifica como Sin OC
+    lookup = np.append(unique_sin_oc.to_numpy(zero_copy_only=False), True).astype(np.int8)
+    data['Tiene OC'] = pd.Categorical.from_codes(lookup[value_codes], categories=TIENE_OC_CATEGORIES)
+    return data
+
+
+def parse_date_column(data: pd.DataFrame, col: str) -> None:
+    """Convierte una columna de fecha a datetime.
+
+    Las fechas se interpretan con el día primero (formato ``dd/mm/aaaa``) y
+    los valores no reconocidos quedan como ``NaT``. Con ``cache=True`` cada
+    texto distinto se interpreta una sola vez.
+
+    Args:
+        data: DataFrame de solicitudes. Se modifica en sitio.
+        col: Nombre de la columna de fecha.
+    """
+    data[col] = pd.to_datetime(data[col], errors='coerce', dayfirst=True, cache=True)
+
+
+def as_category_column(data: pd.DataFrame, col: str) -> None:
+    """Convierte una columna a categoría si aún no lo es.
+
+    Args:
+        data: DataFrame de solicitudes. Se modifica en sitio.
+        col: Nombre de la columna.
+    """
+    if not isinstance(data[col].dtype, pd.CategoricalDtype):
+        data[col] = data[col].astype('category')
+
 
+def downcast_quantity(data: pd.DataFrame) -> None:
+    """Convierte ``Cantidad`` a numérica con el tipo entero más pequeño posible.
+
+    Los textos no numéricos quedan como nulos, también en columnas
+    respaldadas por Arrow. Si todas las cantidades son enteras se usa el
+    entero más pequeño que las contiene; en caso contrario se mantiene
+    ``float64``, ya que ``float32`` redondearía cantidades con más de siete
+    cifras significativas.
+
+    Args:
+        data: DataFrame de solicitudes. Se modifica en sitio.
+    """
+    quantity = pd.to_numeric(data['Cantidad'], errors='coerce', downcast='integer')
+    if isinstance(quantity.dtype, pd.ArrowDtype) and pa.types.is_floating(quantity.dtype.pyarrow_dtype):
+        # En columnas de Arrow los textos no numéricos quedan como NaN y no
+        # como nulos; con float64 de NumPy ambos se tratan como faltantes y
+        # el CSV exportado deja la celda vacía en lugar de escribir "nan"
+        quantity = quantity.astype('float64')
+    data['Cantidad'] = quantity
+
+
+@functools.lru_cache(maxsize=None)
+def build_processor(columns: FrozenSet[str]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Genera la función de procesamiento para un conjunto de columnas.
+
+    Las comprobaciones de qué columnas existen se resuelven una sola vez por
+    estructura de hoja; la función devuelta sólo ejecuta los pasos que
+    corresponden, sin volver a consultar las columnas del DataFrame.
+
+    Args:
+        columns: Columnas presentes en los datos cargados.
+
+    Returns:
+        Función que recibe el DataFrame cargado, lo transforma en sitio
+        (fechas, cantidades, columna ``Tiene OC`` y categorías) y lo
+        devuelve.
+    """
+    steps: List[Callable[[pd.DataFrame], None]] = []
+    for col in DATE_COLS:
+        if col in columns:
+            steps.append(functools.partial(parse_date_column, col=col))
+    if 'Cantidad' in columns:
+        steps.append(downcast_quantity)
+    if 'Doc.Compra' in columns:
+        steps.append(add_tiene_oc_column)
+    for col in CATEGORY_COLS:
+        if col in columns:
+            steps.append(functools.partial(as_category_column, col=col))
+
+    def process(data: pd.DataFrame) -> pd.DataFrame:
+        for step in steps:
+            step(data)
+        return data
+
+    return process
+
+
+def check_required_columns(data: pd.DataFrame) -> None:
+    """Verifica que los datos contengan la columna ``Doc.Compra``.
+
+    Sin esa columna no es posible determinar qué solicitudes tienen OC, por
+    lo que el panel no puede mostrarse.
+
+    Args:
+        data: DataFrame recién cargado.
+
+    Raises:
+        ValueError: Si falta la columna ``Doc.Compra``.
+    """
+    if 'Doc.Compra' not in data.columns:
+        raise ValueError(
+            "Los datos no contienen la columna 'Doc.Compra'; verifique que la "
+            'fila de encabezados sea la correcta.'
+        )
+
+
+def prepare_solped_data(data: pd.DataFrame) -> pd.DataFrame:
+    """Aplica a los datos cargados el procesamiento común a todos los orígenes.
+
+    Args:
+        data: DataFrame recién leído del Excel o de Google Sheets. Se
+            modifica en sitio.
+
+    Returns:
+        El mismo DataFrame procesado.
+    """
+    return build_processor(frozenset(data.columns))(data)
+
+
+def _write_parquet_cache(data: pd.DataFrame, cache_path: Path) -> None:
+    """Guarda el DataFrame procesado en la caché Parquet en disco.
+
+    Las columnas con tipos mezclados (p. ej. un almacén ``A1`` junto a otro
+    numérico ``7``) no se pueden representar en Parquet; en ese caso se
+    guardan como texto y, al leerlas, las de ``CATEGORY_COLS`` vuelven a
+    convertirse en categorías. Después se eliminan los archivos más antiguos
+    para no superar ``PARQUET_CACHE_MAX_FILES``.
+
+    Args:
+        data: DataFrame ya procesado.
+        cache_path: Ruta del archivo Parquet a escribir.
+
+    Raises:
+        OSError: Si no es posible escribir en ``PARQUET_CACHE_DIR``.
+    """
+    PARQUET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        data.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        frame = data.copy(deep=False)
+        for col in frame.columns:
+            try:
+                pa.array(frame[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                frame[col] = frame[col].astype('string')
+        frame.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    cached_files = sorted(
+        PARQUET_CACHE_DIR.glob('*.parquet'), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    for old_file in cached_files[PARQUET_CACHE_MAX_FILES:]:
+        old_file.unlink(missing_ok=True)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
 def load_solped_data(file_like: io.BytesIO) -> pd.DataFrame:
     """Carga y transforma los datos de SOLPED.
 
     El archivo Excel generado por el sistema SAP suele contener dos filas
     vacías al inicio y una fila con nombres de columna. Esta función toma
-    el archivo cargado por el usuario, extrae la fila 3 (índice 2) como
-    cabecera y devuelve un DataFrame con columnas limpias. Además se crea
+    el archivo cargado por el usuario, utiliza la fila 3 (índice 2) como
+    cabecera y devuelve un DataFrame con las columnas de ``NEEDED_COLS``
+    que estén presentes en el archivo. Además se crea
     una columna adicional llamada ``Tiene OC`` que indica si la solicitud
     tiene una orden de compra asociada (valor ``Con OC``) o no la tiene
     (valor ``Sin OC``). Se considera que no tiene OC cuando el campo
     ``Doc.Compra`` contiene textos como ``(en blanco)``, ``nan`` o está
     vacío.
 
+    El resultado se guarda en caché según el contenido del archivo, de
+    modo que las interacciones posteriores con los filtros no vuelven a
+    analizar el Excel. Además se conserva una copia en Parquet dentro de
+    ``PARQUET_CACHE_DIR`` para reutilizarla tras reiniciar la aplicación.
+
     Args:
         file_like: Un objeto de tipo BytesIO que representa el archivo
             Excel cargado a través de Streamlit.
 
     Returns:
         DataFrame con los datos transformados y la columna ``Tiene OC``.
+
+    Raises:
+        ValueError: Si el archivo no contiene la columna ``Doc.Compra``.
     """
-    # Leer el archivo sin cabecera para poder identificar la fila de nombres
-    raw = pd.read_excel(file_like, header=None)
-    # Tomar la tercera fila como cabecera (índice 2 en cero-basado)
-    header = raw.iloc[2].tolist()
-    data = raw.iloc[3:].reset_index(drop=True)
-    data.columns = header
-    # Limpiar la columna Doc.Compra
-    data['Doc.Compra'] = data['Doc.Compra'].astype(str).str.strip()
-    # Determinar si existe OC
-    sin_oc_mask = data['Doc.Compra'].isin(['(en blanco)', 'nan', '', 'None'])
-    data['Tiene OC'] = sin_oc_mask.map({True: 'Sin OC', False: 'Con OC'})
+    digest = hashlib.sha1(file_like.getvalue()).hexdigest()
+    cache_path = PARQUET_CACHE_DIR / f'{digest}-v{PARQUET_CACHE_VERSION}.parquet'
+    if cache_path.exists():
+        try:
+            # Parquet no conserva todas las categorías (p. ej. centros
+            # numéricos o columnas guardadas como texto), así que se vuelven
+            # a convertir
+            data = pd.read_parquet(cache_path, engine='pyarrow')
+            for col in CATEGORY_COLS:
+                if col in data.columns:
+                    as_category_column(data, col)
+            # Marcar el archivo como usado recientemente
+            cache_path.touch()
+            return data
+        except Exception:
+            # Archivo dañado o incompleto: se vuelve a procesar el Excel
+            logger.warning('No se pudo leer la caché %s; se procesa el Excel', cache_path, exc_info=True)
+    # Leer directamente la tercera fila como cabecera (índice 2) y sólo las
+    # columnas que utiliza el panel. El motor calamine (Rust) es bastante más
+    # rápido que openpyxl.
+    data = pd.read_excel(
+        file_like,
+        header=2,
+        usecols=lambda col: col in NEEDED_COLS,
+        dtype=EXCEL_DTYPES,
+        engine='calamine',
+    )
+    check_required_columns(data)
+    prepare_solped_data(data)
+    try:
+        _write_parquet_cache(data, cache_path)
+    except Exception:
+        # La caché en disco es opcional (p. ej. sistema de archivos de sólo
+        # lectura); los datos ya están cargados
+        logger.warning('No se pudo guardar la caché %s', cache_path, exc_info=True)
     return data
 
 
@@ -107,37 +396,171 @@ def load_solped_from_google(sheet_id: str, gid: str) -> Optional[pd.DataFrame]:
     parámetros ``gid`` al final del enlace de exportación para seleccionar la
     pestaña deseada【723629888661203†L160-L176】【723629888661203†L270-L279】.
 
+    Las descargas exitosas se guardan en caché durante
+    ``CACHE_TTL_SECONDS`` para cada combinación de ``sheet_id`` y ``gid``.
+
     Args:
         sheet_id: Identificador único del archivo de Google Sheets.
         gid: Identificador único de la pestaña dentro del documento.
 
     Returns:
-        DataFrame con los datos cargados o ``None`` si la descarga falla.
+        DataFrame con los datos cargados y la columna ``Tiene OC``, o
+        ``None`` si la descarga falla.
+
+    Raises:
+        ValueError: Si la hoja no contiene la columna ``Doc.Compra``.
     """
     url = (
         f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
         f"&id={sheet_id}&gid={gid}"
     )
     try:
-        data = pd.read_csv(url)
-    except Exception as exc:
+        data = _download_google_csv(url)
+    except Exception:
         return None
+    check_required_columns(data)
+    return data
+
+
+@st.cache_resource(show_spinner=False)
+def _http_session() -> requests.Session:
+    """Devuelve una sesión HTTP compartida para reutilizar conexiones."""
+    return requests.Session()
+
+
+class _HttpValidatorStore:
+    """Registro compartido de la última descarga completa de cada URL.
+
+    Para cada URL guarda los validadores HTTP (``etag`` y ``last_modified``)
+    y el DataFrame (``data``) de la última descarga. Sólo se conservan las
+    ``HTTP_VALIDATORS_MAX_URLS`` URL consultadas más recientemente, para que
+    las hojas personalizadas no hagan crecer la memoria sin límite.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Devuelve la entrada de ``url`` o ``None`` si no existe."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        """Guarda la entrada de ``url`` y descarta las menos recientes."""
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource(show_spinner=False)
+def _http_validators() -> _HttpValidatorStore:
+    """Devuelve el registro de descargas, común a todas las sesiones."""
+    return _HttpValidatorStore(HTTP_VALIDATORS_MAX_URLS)
+
+
+def _unique_column_names(names: List[str]) -> List[str]:
+    """Renombra encabezados vacíos o repetidos igual que ``pd.read_csv``.
+
+    El lector CSV de PyArrow conserva los encabezados tal cual, por lo que
+    dos celdas de encabezado vacías producirían columnas duplicadas. Las
+    vacías se nombran ``Unnamed: <posición>`` y las repetidas reciben el
+    sufijo ``.1``, ``.2``, etc.
+
+    Args:
+        names: Nombres de columna leídos del CSV.
+
+    Returns:
+        Lista de nombres sin repetir, en el mismo orden.
+    """
+    names = [name if name else f'Unnamed: {i}' for i, name in enumerate(names)]
+    seen = set(names)
+    counts: Dict[str, int] = {}
+    result = []
+    for name in names:
+        if name in counts:
+            new_name = name
+            while new_name in seen:
+                counts[name] += 1
+                new_name = f'{name}.{counts[name]}'
+            seen.add(new_name)
+            result.append(new_name)
+        else:
+            counts[name] = 0
+            result.append(name)
+    return result
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _download_google_csv(url: str) -> pd.DataFrame:
+    """Descarga y procesa la exportación CSV de una pestaña de Google Sheets.
+
+    El CSV se interpreta con el lector de PyArrow, más rápido que el de
+    pandas, y las columnas quedan respaldadas por Arrow.
+
+    Se mantiene separada de ``load_solped_from_google`` para que sólo las
+    descargas exitosas queden en caché: si ocurre un error, la excepción se
+    propaga y el siguiente intento vuelve a consultar la hoja.
+
+    Cuando vence la caché, la consulta se hace de forma condicional con los
+    encabezados ``If-None-Match`` / ``If-Modified-Since`` de la descarga
+    anterior; si Google responde ``304 Not Modified`` se reutiliza el
+    DataFrame guardado en ``_http_validators`` sin volver a transferir la
+    hoja.
+
+    Args:
+        url: URL de exportación CSV de la pestaña.
+
+    Returns:
+        DataFrame con los datos descargados y la columna ``Tiene OC``.
+    """
+    http_cache = _http_validators()
+    previous = http_cache.get(url)
+    headers = {}
+    if previous is not None:
+        if previous['etag']:
+            headers['If-None-Match'] = previous['etag']
+        if previous['last_modified']:
+            headers['If-Modified-Since'] = previous['last_modified']
+    response = _http_session().get(url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+    if response.status_code == 304 and previous is not None:
+        return previous['data']
+    response.raise_for_status()
+    # Las celdas vacías se leen como nulos (igual que pd.read_csv) y no como
+    # cadenas vacías
+    table = pacsv.read_csv(
+        io.BytesIO(response.content),
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+    )
+    table = table.rename_columns(_unique_column_names(table.column_names))
+    data = table.to_pandas(types_mapper=pd.ArrowDtype)
     # Si la primera fila es el encabezado real, se devuelve directamente
     # Algunas hojas pueden incluir filas vacías iniciales; en tal caso se puede
     # reutilizar la función de transformación `load_solped_data` convirtiendo
     # el DataFrame en un buffer de Bytes e invocándola.
     # Aquí asumimos que el encabezado es correcto.
-    # Crear columna Tiene OC
-    if 'Doc.Compra' in data.columns:
-        data['Doc.Compra'] = data['Doc.Compra'].astype(str).str.strip()
-        sin_oc_mask = data['Doc.Compra'].isin(['(en blanco)', 'nan', '', 'None'])
-        data['Tiene OC'] = sin_oc_mask.map({True: 'Sin OC', False: 'Con OC'})
+    # Mismo procesamiento que el Excel: fechas, cantidades, Tiene OC y categorías
+    prepare_solped_data(data)
+    http_cache.put(url, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'data': data,
+    })
     return data
 
 
 def compute_metrics(data: pd.DataFrame) -> Tuple[int, int, int]:
     """Calcula métricas básicas a partir del DataFrame.
 
+    Ambos conteos se obtienen en una sola pasada sobre los códigos de la
+    columna categórica ``Tiene OC``.
+
     Args:
         data: DataFrame de solicitudes procesadas.
 
@@ -146,9 +569,226 @@ def compute_metrics(data: pd.DataFrame) -> Tuple[int, int, int]:
         orden de compra y el número de solicitudes sin orden de compra.
     """
     total = len(data)
-    con_oc = (data['Tiene OC'] == 'Con OC').sum()
-    sin_oc = (data['Tiene OC'] == 'Sin OC').sum()
-    return total, con_oc, sin_oc
+    codes = data['Tiene OC'].cat.codes.to_numpy()
+    con_oc, sin_oc = np.bincount(codes, minlength=len(TIENE_OC_CATEGORIES))
+    return total, int(con_oc), int(sin_oc)
+
+
+def filter_options(values: pd.Series) -> list:
+    """Devuelve los valores distintos y ordenados de una columna de filtro.
+
+    Los cargadores almacenan las columnas de filtro (``CATEGORY_COLS``) como
+    categorías, que ya contienen los valores únicos ordenados, por lo que no
+    es necesario recorrer las filas.
+
+    Args:
+        values: Columna categórica de la que se obtienen las opciones.
+
+    Returns:
+        Lista de valores no nulos, sin repetir y ordenados.
+    """
+    return values.cat.categories.tolist()
+
+
+def _isin_mask(values: pd.Series, selected: Tuple) -> np.ndarray:
+    """Devuelve una máscara booleana con las filas cuyo valor está en ``selected``.
+
+    Para columnas categóricas se comparan los códigos enteros de las
+    categorías seleccionadas en lugar de las cadenas de cada fila.
+
+    Args:
+        values: Columna a evaluar.
+        selected: Valores seleccionados por el usuario.
+
+    Returns:
+        Arreglo booleano de NumPy con la misma longitud que ``values``.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        selected_codes = values.cat.categories.get_indexer(list(selected))
+        # get_indexer devuelve -1 para valores inexistentes, que coincidiría
+        # con el código de los nulos
+        selected_codes = selected_codes[selected_codes >= 0]
+        return np.isin(values.cat.codes.to_numpy(), selected_codes)
+    return values.isin(selected).to_numpy()
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=ARROW_TABLE_MAX_ENTRIES, show_spinner=False)
+def to_arrow_table(data: pd.DataFrame) -> pa.Table:
+    """Convierte el DataFrame en una tabla de PyArrow.
+
+    La conversión se hace una vez por cada conjunto de datos cargado: la
+    tabla es inmutable, por lo que se guarda con ``st.cache_resource`` y los
+    cambios de filtro sólo calculan la máscara y aplican ``Table.filter``.
+
+    Las columnas categóricas se convierten en diccionarios de Arrow sin
+    copiar los códigos. Las columnas con tipos mezclados que Arrow no puede
+    representar se convierten a texto, y las fechas sin hora se guardan como
+    ``date32`` para que el CSV muestre sólo el día.
+
+    Args:
+        data: DataFrame de solicitudes procesadas.
+
+    Returns:
+        Tabla de PyArrow con las mismas columnas que ``data``.
+    """
+    arrays = []
+    for col in data.columns:
+        try:
+            arr = pa.array(data[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arr = pa.array(data[col].astype('string'), type=pa.string(), from_pandas=True)
+        if pa.types.is_timestamp(arr.type):
+            is_date = pc.all(pc.equal(pc.floor_temporal(arr, unit='day'), arr)).as_py()
+            if is_date is not False:
+                arr = arr.cast(pa.date32())
+        arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in data.columns])
+
+
+def table_to_csv_bytes(table: pa.Table) -> bytes:
+    """Serializa la tabla a CSV codificado en UTF-8 con el escritor de PyArrow.
+
+    Args:
+        table: Tabla a exportar.
+
+    Returns:
+        Contenido del archivo CSV en bytes.
+    """
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def filter_solped_table(
+    data: pd.DataFrame,
+    solicitante_col: Optional[str],
+    selected_solicitantes: Tuple,
+    centro_col: Optional[str],
+    selected_centros: Tuple,
+    estado_oc: str,
+) -> Tuple[pa.Table, bytes]:
+    """Aplica los filtros de la barra lateral y genera el CSV de descarga.
+
+    Se reutiliza la tabla de PyArrow de ``to_arrow_table``, se filtra con
+    ``Table.filter`` y se serializan con el escritor CSV de Arrow, sin
+    DataFrames intermedios. El resultado se guarda en caché según el
+    contenido de ``data`` y los valores seleccionados, por lo que volver a
+    una combinación de filtros ya utilizada no repite el cálculo.
+
+    Args:
+        data: DataFrame de solicitudes procesadas.
+        solicitante_col: Nombre de la columna de solicitante o ``None``.
+        selected_solicitantes: Solicitantes seleccionados. Una tupla vacía
+            no aplica filtro.
+        centro_col: Nombre de la columna de centro o ``None``.
+        selected_centros: Centros seleccionados. Una tupla vacía no aplica
+            filtro.
+        estado_oc: ``Todos``, ``Con OC`` o ``Sin OC``.
+
+    Returns:
+        Una tupla con la tabla filtrada y su contenido en CSV.
+    """
+    # Combinar todas las condiciones en una sola máscara para seleccionar
+    # las filas de una vez; las columnas categóricas se comparan por código
+    mask = np.ones(len(data), dtype=bool)
+    if solicitante_col and selected_solicitantes:
+        mask &= _isin_mask(data[solicitante_col], selected_solicitantes)
+    if centro_col and selected_centros:
+        mask &= _isin_mask(data[centro_col], selected_centros)
+    if estado_oc != 'Todos':
+        mask &= (data['Tiene OC'] == estado_oc).to_numpy()
+    table = to_arrow_table(data)
+    if not mask.all():
+        table = table.filter(pa.array(mask))
+    return table, table_to_csv_bytes(table)
+
+
+def monthly_counts(dates: pd.Series) -> pd.Series:
+    """Cuenta registros por mes a partir de una columna de fechas.
+
+    Las fechas se truncan al mes con ``datetime64[M]`` y se cuentan con
+    ``np.bincount`` sobre el desplazamiento respecto al primer mes, de modo
+    que los meses intermedios sin registros aparecen con cantidad cero. Las
+    fechas posteriores a ``CHART_MAX_DATE`` se ignoran.
+
+    Args:
+        dates: Columna de tipo datetime; los valores nulos se ignoran.
+
+    Returns:
+        Serie ``Cantidad`` indexada por ``Periodo`` (inicio de cada mes), con
+        la misma unidad de tiempo que ``dates``. Vacía si no hay fechas
+        válidas.
+    """
+    unit, _ = np.datetime_data(dates.dtype)
+    valid = dates.dropna()
+    months = valid[valid <= CHART_MAX_DATE].to_numpy(dtype='datetime64[M]')
+    if months.size == 0:
+        return pd.Series(
+            dtype='int64', name='Cantidad', index=pd.DatetimeIndex([], dtype=f'datetime64[{unit}]', name='Periodo')
+        )
+    first = months.min()
+    counts = np.bincount((months - first).astype(np.int64))
+    periods = first + np.arange(counts.size)
+    return pd.Series(
+        counts, name='Cantidad', index=pd.DatetimeIndex(periods.astype(f'datetime64[{unit}]'), name='Periodo')
+    )
+
+
+def show_sin_oc_analysis(data: pd.DataFrame) -> None:
+    """Muestra el análisis específico de las SOLPED sin OC.
+
+    Este apartado genera gráficos y tablas adicionales para las solicitudes
+    que no tienen orden de compra relacionada. La intención es proporcionar
+    pistas sobre cuáles solicitantes, fechas o cantidades requieren mayor
+    atención. Si no hay solicitudes sin OC, o una columna no tiene valores,
+    se omite el cálculo correspondiente.
+
+    Args:
+        data: DataFrame de solicitudes procesadas con la columna ``Tiene OC``.
+    """
+    # Seleccionar una sola vez las filas sin OC y únicamente las columnas
+    # que se analizan, en lugar de copiar el DataFrame completo
+    analysis_cols = [col for col in SIN_OC_ANALYSIS_COLS if col in data.columns]
+    missing = data.loc[(data['Tiene OC'] == 'Sin OC').to_numpy(), analysis_cols]
+    if missing.empty:
+        return
+    st.subheader('Análisis de SOLPED sin OC')
+
+    def has_values(col: str) -> bool:
+        return col in missing.columns and missing[col].notna().any()
+
+    # Gráfica por solicitante
+    if has_values('Solicitante'):
+        counts_solic = missing['Solicitante'].value_counts().rename('Cantidad')
+        # Si la columna es categórica, value_counts incluye también
+        # los solicitantes que no tienen SOLPED sin OC
+        counts_solic = counts_solic[counts_solic > 0]
+        st.markdown('**Solicitudes sin OC por solicitante**')
+        st.bar_chart(counts_solic)
+
+    # Las fechas ya se convirtieron a datetime al cargar los datos
+    # Fecha de modificación
+    if has_values('Fecha Mod.'):
+        st.markdown('**Evolución mensual de SOLPED sin OC (Fecha Mod.)**')
+        st.line_chart(monthly_counts(missing['Fecha Mod.']))
+
+    # Fecha de solicitud
+    if has_values('Fecha Sol.'):
+        st.markdown('**Evolución mensual de SOLPED sin OC (Fecha Sol.)**')
+        st.line_chart(monthly_counts(missing['Fecha Sol.']))
+
+    # Cantidad de pedido
+    if has_values('Cantidad'):
+        counts_qty = (
+            missing['Cantidad']
+            .value_counts()
+            .sort_index()
+            .rename('Frecuencia')
+        )
+        if not counts_qty.empty:
+            st.markdown('**Distribución de cantidades en SOLPED sin OC**')
+            st.bar_chart(counts_qty)
 
 
 def main() -> None:
@@ -173,7 +813,11 @@ def main() -> None:
     data: Optional[pd.DataFrame] = None
     if source_option == 'Google Sheet (predefinido)':
         # Utilizar los identificadores por defecto definidos arriba
-        data = load_solped_from_google(DEFAULT_SHEET_ID, DEFAULT_GID)
+        try:
+            data = load_solped_from_google(DEFAULT_SHEET_ID, DEFAULT_GID)
+        except ValueError as e:
+            st.error(f'La hoja predefinida no tiene el formato esperado: {e}')
+            return
         if data is None:
             st.error(
                 'No se pudieron descargar los datos desde la hoja predefinida. '
@@ -205,38 +849,39 @@ def main() -> None:
             help='El parámetro "gid" que aparece al final de la URL cuando seleccionas la pestaña deseada'
         )
         if sheet_id and gid:
-            data = load_solped_from_google(sheet_id, gid)
+            try:
+                data = load_solped_from_google(sheet_id, gid)
+            except ValueError as e:
+                st.error(f'La hoja no tiene el formato esperado: {e}')
+                return
             if data is None:
                 st.error('No se pudieron descargar los datos. Verifique que el documento sea público y que los identificadores sean correctos.')
                 return
 
     # Si se cargaron datos correctamente, mostrar contenido y filtros
     if data is not None:
-        # Asegurar que exista la columna 'Tiene OC'
-        if 'Tiene OC' not in data.columns and 'Doc.Compra' in data.columns:
-            data['Doc.Compra'] = data['Doc.Compra'].astype(str).str.strip()
-            sin_oc_mask = data['Doc.Compra'].isin(['(en blanco)', 'nan', '', 'None'])
-            data['Tiene OC'] = sin_oc_mask.map({True: 'Sin OC', False: 'Con OC'})
-
         total, con_oc, sin_oc = compute_metrics(data)
         col1, col2, col3 = st.columns(3)
         col1.metric('Total SOLPED', total)
         col2.metric('Con OC', con_oc)
         col3.metric('Sin OC', sin_oc)
 
-        counts = data['Tiene OC'].value_counts().rename_axis('Estado').reset_index(name='Cantidad')
+        counts = pd.DataFrame(
+            {'Cantidad': [con_oc, sin_oc]},
+            index=pd.Index(TIENE_OC_CATEGORIES, name='Estado'),
+        )
         st.subheader('Distribución de solicitudes con y sin OC')
-        st.bar_chart(data=counts.set_index('Estado'))
+        st.bar_chart(data=counts)
 
         # Filtros comunes
         st.sidebar.header('Filtros')
         solicitante_col = 'Solicitante' if 'Solicitante' in data.columns else None
         centro_col = 'Centro' if 'Centro' in data.columns else None
-        solicitantes = sorted(data[solicitante_col].dropna().unique().tolist()) if solicitante_col else []
+        solicitantes = filter_options(data[solicitante_col]) if solicitante_col else []
         selected_solicitantes = st.sidebar.multiselect(
             'Solicitante', options=solicitantes, default=solicitantes
         ) if solicitante_col else []
-        centros = sorted(data[centro_col].dropna().unique().tolist()) if centro_col else []
+        centros = filter_options(data[centro_col]) if centro_col else []
         selected_centros = st.sidebar.multiselect(
             'Centro', options=centros, default=centros
         ) if centro_col else []
@@ -244,19 +889,31 @@ def main() -> None:
             'Estado de OC', options=['Todos', 'Con OC', 'Sin OC'], index=0
         )
 
-        # Aplicar filtros
-        filtered_data = data.copy()
-        if solicitante_col and selected_solicitantes:
-            filtered_data = filtered_data[filtered_data[solicitante_col].isin(selected_solicitantes)]
-        if centro_col and selected_centros:
-            filtered_data = filtered_data[filtered_data[centro_col].isin(selected_centros)]
-        if estado_oc != 'Todos':
-            filtered_data = filtered_data[filtered_data['Tiene OC'] == estado_oc]
+        # Aplicar filtros. Si el usuario mantiene todas las opciones
+        # seleccionadas no es necesario filtrar por esa columna.
+        if len(selected_solicitantes) == len(solicitantes):
+            selected_solicitantes = []
+        if len(selected_centros) == len(centros):
+            selected_centros = []
+        filtered_table, csv = filter_solped_table(
+            data,
+            solicitante_col,
+            tuple(selected_solicitantes),
+            centro_col,
+            tuple(selected_centros),
+            estado_oc,
+        )
 
         st.subheader('Detalle de SOLPED filtradas')
-        st.dataframe(filtered_data, use_container_width=True)
+        page_size = st.sidebar.selectbox('Filas por página', options=PAGE_SIZE_OPTIONS, index=1)
+        num_rows = filtered_table.num_rows
+        num_pages = max(1, -(-num_rows // page_size))
+        page = st.sidebar.number_input('Página', min_value=1, max_value=num_pages, value=1, step=1)
+        start = (page - 1) * page_size
+        end = min(start + page_size, num_rows)
+        st.dataframe(filtered_table.slice(start, end - start), use_container_width=True)
+        st.caption(f'Mostrando filas {start + 1 if end else 0}–{end} de {num_rows}')
 
-        csv = filtered_data.to_csv(index=False).encode('utf-8')
         st.download_button(
             label='Descargar datos filtrados en CSV',
             data=csv,
@@ -265,74 +922,7 @@ def main() -> None:
         )
 
         # ----- Análisis específico para SOLPED sin OC -----
-        # Este apartado genera gráficos y tablas adicionales para las
-        # solicitudes que no tienen orden de compra relacionada. La intención
-        # es proporcionar pistas sobre cuáles solicitantes, fechas o cantidades
-        # requieren mayor atención.
-        if 'Sin OC' in data['Tiene OC'].unique():
-            missing = data[data['Tiene OC'] == 'Sin OC'].copy()
-            st.subheader('Análisis de SOLPED sin OC')
-
-            # Gráfica por solicitante
-            if 'Solicitante' in missing.columns:
-                counts_solic = missing['Solicitante'].value_counts().reset_index()
-                counts_solic.columns = ['Solicitante', 'Cantidad']
-                if not counts_solic.empty:
-                    st.markdown('**Solicitudes sin OC por solicitante**')
-                    st.bar_chart(counts_solic.set_index('Solicitante'))
-
-            # Conversión de fechas de mod y solicitud si existen
-            # Fecha de modificación
-            if 'Fecha Mod.' in missing.columns:
-                try:
-                    missing['Fecha Mod.'] = pd.to_datetime(missing['Fecha Mod.'], errors='coerce', dayfirst=True)
-                    counts_fmod = (
-                        missing.dropna(subset=['Fecha Mod.'])
-                        .groupby(pd.Grouper(key='Fecha Mod.', freq='M'))
-                        .size()
-                        .reset_index(name='Cantidad')
-                    )
-                    if not counts_fmod.empty:
-                        counts_fmod['Periodo'] = counts_fmod['Fecha Mod.'].dt.to_period('M').dt.to_timestamp()
-                        st.markdown('**Evolución mensual de SOLPED sin OC (Fecha Mod.)**')
-                        st.line_chart(counts_fmod.set_index('Periodo')['Cantidad'])
-                except Exception:
-                    pass
-
-            # Fecha de solicitud
-            if 'Fecha Sol.' in missing.columns:
-                try:
-                    missing['Fecha Sol.'] = pd.to_datetime(missing['Fecha Sol.'], errors='coerce', dayfirst=True)
-                    counts_fsol = (
-                        missing.dropna(subset=['Fecha Sol.'])
-                        .groupby(pd.Grouper(key='Fecha Sol.', freq='M'))
-                        .size()
-                        .reset_index(name='Cantidad')
-                    )
-                    if not counts_fsol.empty:
-                        counts_fsol['Periodo'] = counts_fsol['Fecha Sol.'].dt.to_period('M').dt.to_timestamp()
-                        st.markdown('**Evolución mensual de SOLPED sin OC (Fecha Sol.)**')
-                        st.line_chart(counts_fsol.set_index('Periodo')['Cantidad'])
-                except Exception:
-                    pass
-
-            # Cantidad de pedido
-            if 'Cantidad' in missing.columns:
-                try:
-                    # Convertir cantidad a numérica en caso de ser cadena
-                    missing['Cantidad'] = pd.to_numeric(missing['Cantidad'], errors='coerce')
-                    counts_qty = (
-                        missing.dropna(subset=['Cantidad'])
-                        .groupby('Cantidad')
-                        .size()
-                        .reset_index(name='Frecuencia')
-                        .sort_values(by='Cantidad')
-                    )
-                    if not counts_qty.empty:
-                        st.markdown('**Distribución de cantidades en SOLPED sin OC**')
-                        st.bar_chart(counts_qty.set_index('Cantidad'))
-                except Exception:
-                    pass
+        show_sin_oc_analysis(data)
     else:
         st.info('Seleccione un origen de datos y proporcione la información necesaria para cargar los registros.')
 